@@ -14,8 +14,64 @@ if not DASHSCOPE_API_KEY:
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "data", "sample.docx")
 DB_PATH = os.path.join(BASE_DIR, "chroma_db")
+EMBEDDING_CACHE_PATH = os.path.join(BASE_DIR, "embedding_cache.sqlite")
+INDEX_DIR = os.path.join(BASE_DIR, "index")  # memory-mapped dense + BM25 arrays
 
 # Models
 EMBEDDING_MODEL_NAME = "text-embedding-v1"
 LLM_MODEL_NAME = "qwen-turbo"
+EMBEDDING_BATCH_SIZE = 25  # DashScope text-embedding-v1 accepts at most 25 texts per request
+EMBEDDING_WORKERS = 8  # concurrent embedding requests during ingest
 MAX_RETRIES = 3
+
+# Query routing: only clear small talk is refused; everything else goes to retrieval
+GREETINGS = (
+    "你好", "您好", "嗨", "哈喽", "在吗", "在不在", "早上好", "中午好", "晚上好", "谢谢", "多谢",
+    "再见", "拜拜", "hi", "hello", "hey", "thanks",
+)  # matched against the whole normalized question
+OFF_TOPIC_TERMS = (
+    "你是谁", "你叫什么", "讲个笑话", "说个笑话", "天气", "写首诗", "写一首诗", "唱首歌",
+    "星座", "菜谱", "几点了",
+)
+# Any of these keeps a question in scope even if it also matches OFF_TOPIC_TERMS
+LEGAL_TERMS = (
+    "法", "律", "条", "权", "责任", "义务", "合同", "协议", "违约", "赔偿", "侵权", "债",
+    "物权", "所有", "抵押", "质押", "担保", "买卖", "租", "借", "贷", "婚", "离婚", "夫妻",
+    "抚养", "赡养", "监护", "收养", "继承", "遗嘱", "遗产", "财产", "房", "宅基地", "土地",
+    "人格", "名誉", "隐私", "肖像", "姓名", "民事", "诉讼", "时效", "代理", "法人", "过错",
+    "损害", "损失", "欠", "纠纷", "起诉", "判", "补偿", "押金", "定金", "彩礼", "户",
+)
+REFUSAL_MESSAGE = "抱歉，我只能回答与《中华人民共和国民法典》相关的问题，请换一个法律问题试试。"
+
+# Vector index: cosine HNSW graph, denser than Chroma's defaults (M=16, ef_construction=100)
+HNSW_CONFIGURATION = {
+    "hnsw": {
+        "space": "cosine",
+        "ef_construction": 200,
+        "max_neighbors": 32,
+        "ef_search": 100,
+    }
+}
+
+# Retrieval
+K = 4  # chunks passed on after MMR
+FETCH_K = 20  # nearest candidates MMR chooses from
+MMR_LAMBDA = 0.5  # 1 = pure relevance, 0 = maximum diversity
+SCORE_THRESHOLD = 0.85  # top-1 relevance above this skips LLM grading
+BM25_WEIGHT = 0.4  # keyword share in reciprocal-rank fusion
+DENSE_WEIGHT = 0.6  # vector share in reciprocal-rank fusion
+RETRIEVAL_CACHE_SIZE = 256  # retrieval results remembered per process, keyed by normalized query
+
+# Reranking (opt-in): `pip install sentence-transformers`, then set e.g. "BAAI/bge-reranker-base".
+# When enabled it replaces the MMR + relevance gate + LLM grader path; the model downloads on first use.
+RERANK_MODEL_NAME = None
+RERANK_FETCH_K = 40  # candidates pulled from the vector store
+RERANK_TOP_N = 4  # chunks passed to the generator
+RERANK_MIN_SCORE = 0.2  # sigmoid relevance below this is dropped
+
+# Grading
+GRADE_CONCURRENCY = 8  # max concurrent per-document grader requests
+
+# Generation
+MAX_CONTEXT_TOKENS = 800  # context budget for the generator (1 CJK char ≈ 1 token)
+GENERATION_CACHE_SIZE = 256  # answers remembered per process
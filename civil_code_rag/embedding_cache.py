@@ -0,0 +1,114 @@
+import hashlib
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with a persistent SQLite cache.
+
+    Vectors are keyed by sha256(model + text type + text). The text type is part of
+    the key because DashScope embeds queries and documents differently. Query
+    embeddings are also kept in an in-process LRU for hot repeats within a session.
+
+    Documents that miss the cache are sent in batches of batch_size, with up to
+    max_workers batches in flight at once.
+
+    Args:
+        underlying: The embedding model that is called on a cache miss
+        model_name: Model name mixed into the cache key
+        cache_path: SQLite file that stores the vectors
+        memory_size: Number of query embeddings kept in memory
+        batch_size: Texts per embedding request
+        max_workers: Embedding requests sent concurrently
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: str,
+        cache_path: str,
+        memory_size: int = 1024,
+        batch_size: int = 25,
+        max_workers: int = 8,
+    ):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._cached_query = lru_cache(maxsize=memory_size)(self._embed_query)
+
+    def _key(self, text_type: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text_type}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    found[key] = array("d", blob).tolist()
+        return found
+
+    def _store(self, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("d", vector).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key("document", text) for text in texts]
+        vectors = self._load(keys)
+
+        # Embed each distinct missing text once
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            new_vectors = self._embed_in_batches(list(missing.values()))
+            computed = dict(zip(missing.keys(), new_vectors))
+            self._store(computed)
+            vectors.update(computed)
+
+        return [vectors[key] for key in keys]
+
+    def _embed_in_batches(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self.underlying.embed_documents(batches[0])
+
+        # Embedding is I/O bound, so threads overlap the HTTP round-trips.
+        # map() keeps the batches in order.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self.underlying.embed_documents, batches)
+            return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        return list(self._cached_query(text))
+
+    def _embed_query(self, text: str) -> tuple:
+        key = self._key("query", text)
+        cached = self._load([key])
+        if key in cached:
+            return tuple(cached[key])
+
+        vector = self.underlying.embed_query(text)
+        self._store({key: vector})
+        return tuple(vector)
@@ -1,5 +1,10 @@
+import asyncio
 import os
-from typing import Dict, List, TypedDict
+import re
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Literal, TypedDict
 
 from langchain_chroma import Chroma
 from langchain_community.chat_models import ChatTongyi
@@ -9,12 +14,87 @@ from pydantic import BaseModel, Field
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import END, StateGraph
 
-from config import DB_PATH, EMBEDDING_MODEL_NAME, LLM_MODEL_NAME, MAX_RETRIES
+from config import (
+    BM25_WEIGHT,
+    DB_PATH,
+    DENSE_WEIGHT,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MODEL_NAME,
+    FETCH_K,
+    GENERATION_CACHE_SIZE,
+    GRADE_CONCURRENCY,
+    GREETINGS,
+    HNSW_CONFIGURATION,
+    INDEX_DIR,
+    K,
+    LEGAL_TERMS,
+    LLM_MODEL_NAME,
+    MAX_CONTEXT_TOKENS,
+    MAX_RETRIES,
+    MMR_LAMBDA,
+    OFF_TOPIC_TERMS,
+    REFUSAL_MESSAGE,
+    RETRIEVAL_CACHE_SIZE,
+    RERANK_FETCH_K,
+    RERANK_MIN_SCORE,
+    RERANK_MODEL_NAME,
+    RERANK_TOP_N,
+    SCORE_THRESHOLD,
+)
+from embedding_cache import CachedEmbeddings
+from retrieval import CHUNKS_FILE, BM25Index, MmapVectorStore, load_chunks, reciprocal_rank_fusion
 
 # --- Configuration ---
-EMBEDDING_MODEL = DashScopeEmbeddings(model=EMBEDDING_MODEL_NAME)
 LLM_MODEL = LLM_MODEL_NAME # or qwen-plus, qwen-max
 
+# Answers keyed by (normalized question, retrieved chunk ids), oldest evicted first
+_GENERATION_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+# (documents, skip_grade) keyed by normalized question, oldest evicted first
+_RETRIEVAL_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+
+def normalize_question(question: str) -> str:
+    """Lowercase and drop whitespace/punctuation so trivially different phrasings compare equal."""
+    return re.sub(r"[\W_]+", "", question.lower())
+
+def compress_context(question: str, documents: list, max_tokens: int) -> str:
+    """
+    Keep only the sentences of the documents that best match the question.
+
+    Sentences are scored by how many character bigrams they share with the question
+    and taken best-first until max_tokens is reached (1 CJK character ≈ 1 qwen token).
+    Kept sentences stay in their original order; documents are joined with "---".
+    """
+    normalized = normalize_question(question)
+    keywords = {normalized[i : i + 2] for i in range(len(normalized) - 1)} or set(normalized)
+
+    candidates = []
+    for doc_index, d in enumerate(documents):
+        sentences = [s for s in re.split(r"(?<=[。；！？])", d.page_content) if s.strip()]
+        for sent_index, sentence in enumerate(sentences):
+            score = sum(1 for k in keywords if k in sentence)
+            candidates.append((score, doc_index, sent_index, sentence.strip()))
+
+    # Sentences without any keyword only count if nothing matched at all
+    if any(c[0] > 0 for c in candidates):
+        candidates = [c for c in candidates if c[0] > 0]
+    candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+    kept, used = [], 0
+    for candidate in candidates:
+        if used + len(candidate[3]) > max_tokens:
+            if kept:
+                continue
+            # Never hand the generator an empty context: cut the best sentence to fit
+            candidate = candidate[:3] + (candidate[3][:max_tokens],)
+        kept.append(candidate)
+        used += len(candidate[3])
+
+    kept.sort(key=lambda c: (c[1], c[2]))
+    by_doc: Dict[int, List[str]] = {}
+    for _, doc_index, _, sentence in kept:
+        by_doc.setdefault(doc_index, []).append(sentence)
+    return "\n---\n".join("".join(sentences) for sentences in by_doc.values())
+
 # --- State ---
 class GraphState(TypedDict):
     """
@@ -25,18 +105,226 @@ class GraphState(TypedDict):
         generation: LLM generation
         documents: list of documents
         retry_count: number of retries for query rewriting
+        skip_grade: top-1 retrieval score is high enough to skip LLM grading
+        attempts: normalized queries already tried
+        rewrite_stalled: the last rewrite repeated an earlier query
     """
     question: str
     generation: str
     documents: List[str]
     retry_count: int
+    skip_grade: bool
+    attempts: List[str]
+    rewrite_stalled: bool
+
+# --- Data models for grading ---
+class GradeDocument(BaseModel):
+    """Binary score for relevance check on a single retrieved document."""
+    binary_score: str = Field(description="Documents are relevant to the question, 'yes' or 'no'")
+
+class GradeDocuments(BaseModel):
+    """Binary scores for relevance check on a batch of retrieved documents."""
+    scores: List[Literal["yes", "no"]] = Field(
+        description="One score per document, in the same order as the documents, 'yes' or 'no'"
+    )
+
+# --- Prompts ---
+GRADE_SYSTEM = """你是一名评分员，负责评估检索到的文档与用户问题的相关性。\n
+    如果文档包含与用户问题相关的关键词或语义含义，请将其评为相关。\n
+    这不需要非常严格的测试。目标是过滤掉错误的检索结果。\n
+    请给出二元评分 'yes' 或 'no' 来表明文档是否与问题相关。"""
+
+GRADE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", GRADE_SYSTEM),
+        ("human", "检索到的文档: \n\n {document} \n\n 用户问题: {question}"),
+    ]
+)
+
+BATCH_GRADE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", GRADE_SYSTEM + "\n文档以 [序号] 开头，请按序号顺序为每篇文档给出一个评分，评分总数必须恰好为 {count} 个。"),
+        ("human", "检索到的文档: \n\n {documents} \n\n 用户问题: {question}"),
+    ]
+)
+
+RAG_PROMPT = ChatPromptTemplate.from_template(
+    """你是一个基于《中华人民共和国民法典》回答问题的助手。
+    请使用以下检索到的上下文来回答问题。
+    如果你不知道答案，就直接说不知道，不要试图编造答案。
+    回答要尽量简洁，控制在三句话以内。
+    
+    问题: {question} 
+    上下文: {context} 
+    回答:"""
+)
+
+REWRITE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", """你是一个问题改写助手。你的任务是将输入的问题改写为更适合向量检索的形式。
+        请分析问题的核心意图，并尝试用更专业或更准确的法律术语进行表达。
+        只输出改写后的问题，不要包含任何解释。"""),
+        ("human", "初始问题: {question}"),
+    ]
+)
+
+# --- Clients ---
+# Built once on first use and shared by every query; reset_clients() drops them.
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    """DashScope embeddings behind the persistent SQLite cache (opened on first use)."""
+    return CachedEmbeddings(
+        DashScopeEmbeddings(model=EMBEDDING_MODEL_NAME), EMBEDDING_MODEL_NAME, EMBEDDING_CACHE_PATH
+    )
+
+@lru_cache(maxsize=None)
+def get_chunks():
+    """Chunks of the memory-mapped index written by ingest.py, or None if it does not exist."""
+    if not os.path.exists(os.path.join(INDEX_DIR, CHUNKS_FILE)):
+        return None
+    return load_chunks(INDEX_DIR)
+
+@lru_cache(maxsize=None)
+def get_vectorstore():
+    """Memory-mapped index when available, otherwise the Chroma store."""
+    chunks = get_chunks()
+    if chunks is not None:
+        return MmapVectorStore.load(INDEX_DIR, get_embeddings(), chunks)
+    return Chroma(
+        persist_directory=DB_PATH,
+        embedding_function=get_embeddings(),
+        collection_configuration=HNSW_CONFIGURATION,
+    )
+
+@lru_cache(maxsize=None)
+def get_bm25_index():
+    """BM25 index written by ingest.py, or None if it has not been built yet."""
+    chunks = get_chunks()
+    if chunks is None:
+        return None
+    return BM25Index.load(INDEX_DIR, chunks)
+
+def hybrid_search(question, dense_docs, k):
+    """
+    Fuses dense results with the top-k BM25 hits; falls back to dense only.
+
+    Returns the whole fused union (up to 2k documents, like EnsembleRetriever) rather
+    than the top k: with RRF a keyword-only hit can never outrank the k-th dense hit,
+    so cutting to k would drop exactly the article-number matches BM25 is here for.
+    The grader or reranker filters the union afterwards.
+    """
+    bm25 = get_bm25_index()
+    if bm25 is None:
+        return dense_docs[:k]
+    keyword_docs = bm25.search(question, k)
+    return reciprocal_rank_fusion([dense_docs[:k], keyword_docs], [DENSE_WEIGHT, BM25_WEIGHT])
+
+@lru_cache(maxsize=None)
+def get_reranker():
+    """Cross-encoder used to rerank candidates, or None if it is disabled or not installed."""
+    if not RERANK_MODEL_NAME:
+        return None
+    try:
+        from sentence_transformers import CrossEncoder
+    except ImportError:
+        return None
+    return CrossEncoder(RERANK_MODEL_NAME)
+
+@lru_cache(maxsize=None)
+def get_llm():
+    """The one ChatTongyi client shared by the grader, generation and rewrite chains."""
+    return ChatTongyi(model=LLM_MODEL, temperature=0)
+
+@lru_cache(maxsize=None)
+def get_grader_chain():
+    return GRADE_PROMPT | get_llm().with_structured_output(GradeDocument)
+
+@lru_cache(maxsize=None)
+def get_batch_grader_chain():
+    return BATCH_GRADE_PROMPT | get_llm().with_structured_output(GradeDocuments)
+
+@lru_cache(maxsize=None)
+def get_rag_chain():
+    return RAG_PROMPT | get_llm() | StrOutputParser()
+
+@lru_cache(maxsize=None)
+def get_rewrite_chain():
+    return REWRITE_PROMPT | get_llm() | StrOutputParser()
+
+def reset_clients():
+    """Drop the cached embeddings, vector store, LLM, chains and results (e.g. after re-ingesting or in tests)."""
+    _RETRIEVAL_CACHE.clear()
+    _GENERATION_CACHE.clear()
+    for getter in (
+        get_embeddings,
+        get_chunks,
+        get_vectorstore,
+        get_bm25_index,
+        get_reranker,
+        get_llm,
+        get_grader_chain,
+        get_batch_grader_chain,
+        get_rag_chain,
+        get_rewrite_chain,
+    ):
+        getter.cache_clear()
 
 # --- Nodes ---
 
+def search_documents(question):
+    """
+    Runs the retrieval pipeline for one query.
+
+    With a cross-encoder reranker available, the RERANK_FETCH_K nearest chunks are
+    rescored and the best RERANK_TOP_N kept; the reranker replaces LLM grading.
+    Otherwise MMR picks K diverse chunks out of the FETCH_K nearest ones, and when
+    the best match already scores above SCORE_THRESHOLD and BM25 added nothing new,
+    grading is skipped. In both cases BM25 keyword hits are fused in with
+    reciprocal-rank fusion when the index exists; the fused union is returned.
+
+    Returns:
+        tuple: (documents, skip_grade)
+    """
+    vectorstore = get_vectorstore()
+    # Embed once and reuse the vector for every search below
+    query_embedding = get_embeddings().embed_query(question)
+
+    reranker = get_reranker()
+    if reranker is not None:
+        candidates = hybrid_search(
+            question,
+            vectorstore.similarity_search_by_vector(query_embedding, k=RERANK_FETCH_K),
+            RERANK_FETCH_K,
+        )
+        scores = reranker.predict([(question, d.page_content) for d in candidates]) if candidates else []
+        ranked = sorted(zip(candidates, scores), key=lambda item: item[1], reverse=True)
+        documents = [d for d, score in ranked[:RERANK_TOP_N] if score >= RERANK_MIN_SCORE]
+        print(f"---RERANKED {len(candidates)} CANDIDATES, KEPT {len(documents)}---")
+        return documents, True
+
+    top_hits = vectorstore.similarity_search_by_vector_with_relevance_scores(query_embedding, k=1)
+    # Chroma returns distances here; convert with the store's own relevance function
+    relevance = vectorstore._select_relevance_score_fn()
+    top_score = relevance(top_hits[0][1]) if top_hits else 0.0
+
+    dense_docs = vectorstore.max_marginal_relevance_search_by_vector(
+        query_embedding, k=K, fetch_k=FETCH_K, lambda_mult=MMR_LAMBDA
+    )
+    documents = hybrid_search(question, dense_docs, K)
+    # A strong dense match vouches for the dense hits only; keyword-only hits still get graded
+    skip_grade = top_score > SCORE_THRESHOLD and len(documents) <= len(dense_docs)
+    if skip_grade:
+        print(f"---TOP-1 RELEVANCE {top_score:.2f} ABOVE THRESHOLD, SKIPPING GRADING---")
+    return documents, skip_grade
+
 def retrieve(state):
     """
     Retrieve documents
 
+    Results are memoized by normalized query text, so a rewrite that only differs
+    in case, spacing or punctuation does not search again.
+
     Args:
         state (dict): The current graph state
 
@@ -47,17 +335,33 @@ def retrieve(state):
     question = state["question"]
     retry_count = state.get("retry_count", 0)
 
-    # Initialize Vector Store
-    vectorstore = Chroma(persist_directory=DB_PATH, embedding_function=EMBEDDING_MODEL)
-    retriever = vectorstore.as_retriever()
-    
-    documents = retriever.invoke(question)
-    return {"documents": documents, "question": question, "retry_count": retry_count}
-
-def grade_documents(state):
+    cache_key = normalize_question(question)
+    cached = _RETRIEVAL_CACHE.get(cache_key)
+    if cached is not None:
+        print("---RETRIEVAL CACHE HIT---")
+        _RETRIEVAL_CACHE.move_to_end(cache_key)
+        documents, skip_grade = cached
+    else:
+        documents, skip_grade = search_documents(question)
+        _RETRIEVAL_CACHE[cache_key] = (documents, skip_grade)
+        if len(_RETRIEVAL_CACHE) > RETRIEVAL_CACHE_SIZE:
+            _RETRIEVAL_CACHE.popitem(last=False)
+
+    return {
+        "documents": documents,
+        "question": question,
+        "retry_count": retry_count,
+        "skip_grade": skip_grade,
+    }
+
+async def grade_documents(state):
     """
     Determines whether the retrieved documents are relevant to the question.
 
+    All documents are graded in a single structured-output call; if the model
+    returns fewer scores than documents, the missing ones are graded concurrently
+    (at most GRADE_CONCURRENCY requests in flight).
+
     Args:
         state (dict): The current graph state
 
@@ -68,51 +372,50 @@ def grade_documents(state):
     question = state["question"]
     documents = state["documents"]
 
-    # Data model for grading
-    class GradeDocuments(BaseModel):
-        """Binary score for relevance check on retrieved documents."""
-        binary_score: str = Field(description="Documents are relevant to the question, 'yes' or 'no'")
-
-    # LLM with structured output
-    llm = ChatTongyi(model=LLM_MODEL, temperature=0)
-    structured_llm_grader = llm.with_structured_output(GradeDocuments)
+    if not documents:
+        return {"documents": [], "question": question}
 
-    # Prompt
-    system = """你是一名评分员，负责评估检索到的文档与用户问题的相关性。\n
-    如果文档包含与用户问题相关的关键词或语义含义，请将其评为相关。\n
-    这不需要非常严格的测试。目标是过滤掉错误的检索结果。\n
-    请给出二元评分 'yes' 或 'no' 来表明文档是否与问题相关。"""
-    grade_prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", system),
-            ("human", "检索到的文档: \n\n {document} \n\n 用户问题: {question}"),
-        ]
+    enumerated = "\n\n".join(f"[{i}] {d.page_content}" for i, d in enumerate(documents))
+    result = await get_batch_grader_chain().ainvoke(
+        {"question": question, "documents": enumerated, "count": len(documents)}
     )
+    grades = list(result.scores[: len(documents)]) if result else []
+
+    if len(grades) < len(documents):
+        # The batch answer came back short; grade only the missing documents individually
+        print(f"---GRADE: BATCH RETURNED {len(grades)}/{len(documents)} SCORES, GRADING THE REST---")
+        grader = get_grader_chain()
+        semaphore = asyncio.Semaphore(GRADE_CONCURRENCY)
+
+        async def grade_one(d):
+            async with semaphore:
+                score = await grader.ainvoke({"question": question, "document": d.page_content})
+            return score.binary_score if score else None
+
+        grades += await asyncio.gather(*[grade_one(d) for d in documents[len(grades):]])
 
-    grader = grade_prompt | structured_llm_grader
-    
     filtered_docs = []
-    for d in documents:
-        score = grader.invoke({"question": question, "document": d.page_content})
-        
-        if not score:
+    for d, grade in zip(documents, grades):
+        if grade is None:
             print("---GRADE: LLM RETURNED NONE (SKIPPING)---")
             continue
-            
-        grade = score.binary_score
+
         if grade == "yes":
             print("---GRADE: DOCUMENT RELEVANT---")
             filtered_docs.append(d)
         else:
             print("---GRADE: DOCUMENT NOT RELEVANT---")
             continue
-            
+
     return {"documents": filtered_docs, "question": question}
 
-def generate(state):
+async def generate(state):
     """
     Generate answer
 
+    Only the sentences most related to the question are sent as context, and the
+    answer is streamed to stdout token by token as it is decoded.
+
     Args:
         state (dict): The current graph state
 
@@ -123,25 +426,28 @@ def generate(state):
     question = state["question"]
     documents = state["documents"]
 
-    # LLM
-    llm = ChatTongyi(model=LLM_MODEL, temperature=0)
-
-    # Prompt
-    prompt = ChatPromptTemplate.from_template(
-        """你是一个基于《中华人民共和国民法典》回答问题的助手。
-        请使用以下检索到的上下文来回答问题。
-        如果你不知道答案，就直接说不知道，不要试图编造答案。
-        回答要尽量简洁，控制在三句话以内。
-        
-        问题: {question} 
-        上下文: {context} 
-        回答:"""
-    )
-
-    # Chain
-    rag_chain = prompt | llm | StrOutputParser()
+    cache_key = (normalize_question(question), tuple(d.id or d.page_content for d in documents))
+    generation = _GENERATION_CACHE.get(cache_key)
+    if generation is not None:
+        print("---GENERATION CACHE HIT---")
+        _GENERATION_CACHE.move_to_end(cache_key)
+        print("-" * 50)
+        print(f"回答: {generation}")
+    else:
+        print("-" * 50)
+        sys.stdout.write("回答: ")
+        parts = []
+        context = compress_context(question, documents, MAX_CONTEXT_TOKENS)
+        async for chunk in get_rag_chain().astream({"context": context, "question": question}):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+            parts.append(chunk)
+        sys.stdout.write("\n")
+        generation = "".join(parts)
+        _GENERATION_CACHE[cache_key] = generation
+        if len(_GENERATION_CACHE) > GENERATION_CACHE_SIZE:
+            _GENERATION_CACHE.popitem(last=False)
 
-    generation = rag_chain.invoke({"context": documents, "question": question})
     return {"documents": documents, "question": question, "generation": generation}
 
 def rewrite_query(state):
@@ -158,20 +464,93 @@ def rewrite_query(state):
     question = state["question"]
     retry_count = state.get("retry_count", 0)
 
-    llm = ChatTongyi(model=LLM_MODEL, temperature=0)
-
-    # Prompt
-    msg = [
-        ("system", """你是一个问题改写助手。你的任务是将输入的问题改写为更适合向量检索的形式。
-        请分析问题的核心意图，并尝试用更专业或更准确的法律术语进行表达。
-        只输出改写后的问题，不要包含任何解释。"""),
-        ("human", f"初始问题: {question}"),
-    ]
-    
-    better_question = llm.invoke(msg).content
+    better_question = get_rewrite_chain().invoke({"question": question})
     print(f"---QUERY REWRITTEN: {better_question}---")
-    
-    return {"question": better_question, "retry_count": retry_count + 1}
+
+    # Retrying a query we already searched would only return the same documents
+    attempts = state.get("attempts") or [normalize_question(question)]
+    normalized = normalize_question(better_question)
+    if normalized in attempts:
+        print("---REWRITE REPEATS AN EARLIER QUERY, STOPPING RETRIES---")
+        return {"question": better_question, "retry_count": retry_count + 1, "rewrite_stalled": True}
+
+    return {
+        "question": better_question,
+        "retry_count": retry_count + 1,
+        "attempts": attempts + [normalized],
+    }
+
+def refuse(state):
+    """
+    Answer out-of-scope questions with a fixed message, without retrieval.
+
+    Args:
+        state (dict): The current graph state
+
+    Returns:
+        state (dict): New key added to state, generation, that contains the refusal
+    """
+    print("---REFUSE---")
+    print("-" * 50)
+    print(f"回答: {REFUSAL_MESSAGE}")
+    return {"generation": REFUSAL_MESSAGE, "documents": []}
+
+def route_query(state):
+    """
+    Routes the question to retrieval unless it is clearly small talk.
+
+    Refuses only on a positive off-topic signal: the whole question is a greeting, or it
+    contains an OFF_TOPIC_TERMS phrase and no LEGAL_TERMS keyword. Lay questions that
+    use no legal vocabulary still reach retrieval. No embedding or LLM call is made.
+
+    Args:
+        state (dict): The current graph state
+
+    Returns:
+        str: Binary decision for next node to call
+    """
+    print("---ROUTE QUERY---")
+    question = state["question"].lower()
+    is_greeting = normalize_question(question) in GREETINGS
+    is_small_talk = any(term in question for term in OFF_TOPIC_TERMS) and not any(
+        term in question for term in LEGAL_TERMS
+    )
+    if is_greeting or is_small_talk:
+        print("---DECISION: OUT OF SCOPE, REFUSE---")
+        return "out_of_scope"
+    print("---DECISION: IN SCOPE, RETRIEVE---")
+    return "in_scope"
+
+def decide_to_grade(state):
+    """
+    Determines whether retrieved documents need LLM grading.
+
+    Args:
+        state (dict): The current graph state
+
+    Returns:
+        str: Binary decision for next node to call
+    """
+    if state.get("skip_grade"):
+        # Documents are already trusted; only an empty result still needs a rewrite
+        print("---DECISION: RETRIEVAL ALREADY SCORED, SKIPPING GRADING---")
+        return decide_to_generate(state)
+    return "grade_documents"
+
+def decide_after_rewrite(state):
+    """
+    Determines whether a rewritten query is worth another retrieval.
+
+    Args:
+        state (dict): The current graph state
+
+    Returns:
+        str: Binary decision for next node to call
+    """
+    if state.get("rewrite_stalled"):
+        print("---DECISION: NO NEW QUERY, GENERATE---")
+        return "generate"
+    return "retrieve"
 
 def decide_to_generate(state):
     """
@@ -212,10 +591,25 @@ def build_graph():
     workflow.add_node("grade_documents", grade_documents)
     workflow.add_node("generate", generate)
     workflow.add_node("rewrite_query", rewrite_query)
+    workflow.add_node("refuse", refuse)
 
     # Build graph
-    workflow.set_entry_point("retrieve")
-    workflow.add_edge("retrieve", "grade_documents")
+    workflow.set_conditional_entry_point(
+        route_query,
+        {
+            "in_scope": "retrieve",
+            "out_of_scope": "refuse",
+        },
+    )
+    workflow.add_conditional_edges(
+        "retrieve",
+        decide_to_grade,
+        {
+            "grade_documents": "grade_documents",
+            "rewrite_query": "rewrite_query",
+            "generate": "generate",
+        },
+    )
     
     # Conditional edge
     workflow.add_conditional_edges(
@@ -227,8 +621,16 @@ def build_graph():
         },
     )
     
-    workflow.add_edge("rewrite_query", "retrieve")
+    workflow.add_conditional_edges(
+        "rewrite_query",
+        decide_after_rewrite,
+        {
+            "retrieve": "retrieve",
+            "generate": "generate",
+        },
+    )
     workflow.add_edge("generate", END)
+    workflow.add_edge("refuse", END)
 
     # Compile
     app = workflow.compile()
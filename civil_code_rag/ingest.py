@@ -3,7 +3,18 @@ from langchain_community.document_loaders import Docx2txtLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_community.embeddings import DashScopeEmbeddings
-from config import DATA_PATH, DB_PATH, EMBEDDING_MODEL_NAME
+from config import (
+    DATA_PATH,
+    DB_PATH,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_WORKERS,
+    HNSW_CONFIGURATION,
+    INDEX_DIR,
+)
+from embedding_cache import CachedEmbeddings
+from retrieval import BM25Index, MmapVectorStore, save_chunks
 
 def ingest_data():
     """Loads data, splits it, and creates a vector store."""
@@ -28,13 +39,30 @@ def ingest_data():
     print(f"Creating vector store at {DB_PATH}...")
     
     # Note: DashScopeEmbeddings will automatically use DASHSCOPE_API_KEY from os.environ
-    # which is loaded by config.py
+    # which is loaded by config.py. Re-ingesting unchanged chunks is served from the cache;
+    # new chunks are embedded in parallel batches (DashScope retries 429s with backoff).
+    embeddings = CachedEmbeddings(
+        DashScopeEmbeddings(model=EMBEDDING_MODEL_NAME),
+        EMBEDDING_MODEL_NAME,
+        EMBEDDING_CACHE_PATH,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        max_workers=EMBEDDING_WORKERS,
+    )
     vectorstore = Chroma.from_documents(
         documents=chunks,
-        embedding=DashScopeEmbeddings(model=EMBEDDING_MODEL_NAME),
-        persist_directory=DB_PATH
+        embedding=embeddings,
+        persist_directory=DB_PATH,
+        collection_configuration=HNSW_CONFIGURATION,
     )
     print("Vector store created and persisted.")
 
+    print(f"Writing memory-mapped index to {INDEX_DIR}...")
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    save_chunks(INDEX_DIR, chunks)
+    # Served from the embedding cache filled by the vector store build above
+    MmapVectorStore.write(INDEX_DIR, embeddings.embed_documents([c.page_content for c in chunks]))
+    BM25Index.from_documents(chunks).save(INDEX_DIR)
+    print("Dense and BM25 indices persisted.")
+
 if __name__ == "__main__":
     ingest_data()
@@ -1,3 +1,4 @@
+import asyncio
 from graph import build_graph
 import sys
 
@@ -25,12 +26,10 @@ def main():
 
             print("\n正在思考中...\n")
             
-            # Invoke the graph
+            # Invoke the graph; the generate node streams the answer as it is decoded
             inputs = {"question": question}
-            result = app.invoke(inputs)
+            asyncio.run(app.ainvoke(inputs))
             
-            print("-" * 50)
-            print(f"回答: {result['generation']}")
             print("-" * 50)
             print("\n")
             
@@ -0,0 +1,266 @@
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+# Files inside the index directory written by ingest.py
+CHUNKS_FILE = "chunks.json"
+EMBEDDINGS_FILE = "embeddings_int8.npy"
+EMBEDDING_SCALES_FILE = "embedding_scales.npy"
+BM25_VOCAB_FILE = "bm25_vocab.json"
+BM25_ARRAYS = ("post_starts", "post_docs", "post_freqs", "doc_len")
+
+
+def tokenize_zh(text: str) -> List[str]:
+    """
+    Tokenizes text for keyword search without a word segmenter.
+
+    Chinese runs become overlapping character bigrams (single characters stay as
+    they are); Latin words and numbers such as article numbers are kept whole.
+    """
+    tokens = []
+    for run in re.findall(r"[a-z0-9]+|[\u4e00-\u9fff]+", text.lower()):
+        if run.isascii() or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def save_chunks(index_dir: str, documents: List[Document]) -> None:
+    """Writes chunk texts and metadata; row i matches row i of the index arrays."""
+    payload = [{"page_content": d.page_content, "metadata": d.metadata} for d in documents]
+    with open(os.path.join(index_dir, CHUNKS_FILE), "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+def load_chunks(index_dir: str) -> List[Document]:
+    """Reads the chunks written by save_chunks; the row number becomes the document id."""
+    with open(os.path.join(index_dir, CHUNKS_FILE), encoding="utf-8") as f:
+        payload = json.load(f)
+    return [Document(id=str(i), **item) for i, item in enumerate(payload)]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over posting lists stored as flat NumPy arrays.
+
+    Postings are laid out CSR-style: the documents containing token t are
+    post_docs[post_starts[t]:post_starts[t + 1]], with matching term frequencies
+    in post_freqs. Scoring a query touches only the postings of its tokens and
+    runs as vectorized NumPy, with no Python loop over documents.
+    """
+
+    def __init__(self, documents, vocab, post_starts, post_docs, post_freqs, doc_len, k1=1.5, b=0.75):
+        self.documents = documents
+        self.vocab = vocab
+        self.post_starts = post_starts
+        self.post_docs = post_docs
+        self.post_freqs = post_freqs
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+
+        n_docs = len(documents)
+        doc_freq = np.diff(post_starts)
+        # Lucene-style idf, always positive
+        self.idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        avgdl = doc_len.mean() if n_docs else 1.0
+        self.length_norm = k1 * (1 - b + b * doc_len / max(avgdl, 1.0))
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        vocab: Dict[str, int] = {}
+        triples = []
+        doc_len = np.zeros(len(documents), dtype=np.int32)
+        for doc_id, doc in enumerate(documents):
+            tokens = tokenize_zh(doc.page_content)
+            doc_len[doc_id] = len(tokens)
+            for token, freq in Counter(tokens).items():
+                triples.append((vocab.setdefault(token, len(vocab)), doc_id, freq))
+
+        triples.sort()
+        token_ids = np.array([t[0] for t in triples], dtype=np.int32)
+        post_docs = np.array([t[1] for t in triples], dtype=np.int32)
+        post_freqs = np.array([t[2] for t in triples], dtype=np.int32)
+        post_starts = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_ids, minlength=len(vocab)), out=post_starts[1:])
+        return cls(documents, vocab, post_starts, post_docs, post_freqs, doc_len, k1, b)
+
+    def save(self, index_dir: str) -> None:
+        """Writes the posting arrays as .npy files so load() can memory-map them."""
+        for name in BM25_ARRAYS:
+            np.save(os.path.join(index_dir, f"bm25_{name}.npy"), getattr(self, name), allow_pickle=False)
+        with open(os.path.join(index_dir, BM25_VOCAB_FILE), "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "vocab": self.vocab}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, index_dir: str, documents: List[Document]) -> "BM25Index":
+        """Maps the posting arrays read-only; pages are only read when a query touches them."""
+        arrays = {
+            name: np.load(os.path.join(index_dir, f"bm25_{name}.npy"), mmap_mode="r")
+            for name in BM25_ARRAYS
+        }
+        with open(os.path.join(index_dir, BM25_VOCAB_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(documents, meta["vocab"], k1=meta["k1"], b=meta["b"], **arrays)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query."""
+        scores = np.zeros(len(self.documents), dtype=np.float64)
+        for token in set(tokenize_zh(query)):
+            token_id = self.vocab.get(token)
+            if token_id is None:
+                continue
+            start, end = self.post_starts[token_id], self.post_starts[token_id + 1]
+            docs = self.post_docs[start:end]
+            tf = self.post_freqs[start:end]
+            # Each document appears once per posting list, so plain fancy-index add is safe
+            scores[docs] += self.idf[token_id] * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+        return scores
+
+    def search(self, query: str, k: int) -> List[Document]:
+        """Top-k documents with a non-zero score, best first."""
+        scores = self.scores(query)
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.documents[i] for i in top]
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[List[Document]], weights: Sequence[float], c: int = 60
+) -> List[Document]:
+    """
+    Merges ranked result lists with weighted reciprocal-rank fusion.
+
+    Documents are matched by content; the first list's copy is kept, so pass the
+    vector store results first to keep their ids.
+    """
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for results, weight in zip(result_lists, weights):
+        for rank, doc in enumerate(results):
+            key = doc.page_content
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + weight / (c + rank + 1)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _quantize(vectors):
+    """Normalizes rows and stores them as int8 with one float32 scale per row."""
+    matrix = _normalize(vectors)
+    scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127.0
+    quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+# Rows dequantized per step; keeps the float32 scratch buffer small and cache-friendly
+_BLOCK_ROWS = 256
+
+
+class MmapVectorStore(VectorStore):
+    """
+    Read-only dense index over a memory-mapped int8 embedding matrix.
+
+    Rows are L2-normalized and quantized to int8 with a per-row scale when written
+    (4x smaller than float32, and the search is memory-bound). Cosine similarity
+    is a blockwise matrix-vector product of the dequantized rows with the float
+    query. load() maps the .npy files instead of parsing a database, so start-up
+    is just a page-in.
+
+    Scores returned by similarity_search_by_vector_with_relevance_scores are
+    cosine distances (lower is closer), matching Chroma.
+    """
+
+    def __init__(self, embedding: Embeddings, documents: List[Document], matrix: np.ndarray, scales: np.ndarray):
+        self._embedding = embedding
+        self.documents = documents
+        self.matrix = matrix
+        self.scales = scales
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @staticmethod
+    def write(index_dir: str, vectors: List[List[float]]) -> None:
+        """Saves quantized embeddings; row i must belong to chunk i of save_chunks."""
+        quantized, scales = _quantize(vectors)
+        np.save(os.path.join(index_dir, EMBEDDINGS_FILE), quantized, allow_pickle=False)
+        np.save(os.path.join(index_dir, EMBEDDING_SCALES_FILE), scales, allow_pickle=False)
+
+    @classmethod
+    def load(cls, index_dir: str, embedding: Embeddings, documents: List[Document]) -> "MmapVectorStore":
+        matrix = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        scales = np.load(os.path.join(index_dir, EMBEDDING_SCALES_FILE), mmap_mode="r")
+        return cls(embedding, documents, matrix, scales)
+
+    @classmethod
+    def from_texts(
+        cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, **kwargs
+    ) -> "MmapVectorStore":
+        """Builds an in-memory store, mainly for experiments and tests."""
+        metadatas = metadatas or [{} for _ in texts]
+        documents = [
+            Document(id=str(i), page_content=text, metadata=metadata)
+            for i, (text, metadata) in enumerate(zip(texts, metadatas))
+        ]
+        return cls(embedding, documents, *_quantize(embedding.embed_documents(list(texts))))
+
+    def _select_relevance_score_fn(self):
+        return self._cosine_relevance_score_fn
+
+    def _rows(self, indices) -> np.ndarray:
+        """Dequantized float32 rows."""
+        return self.matrix[indices].astype(np.float32) * self.scales[indices, None]
+
+    def _top(self, embedding: List[float], k: int):
+        query = _normalize(embedding)
+        similarities = np.empty(len(self.matrix), dtype=np.float32)
+        for start in range(0, len(self.matrix), _BLOCK_ROWS):
+            end = start + _BLOCK_ROWS
+            block = self.matrix[start:end].astype(np.float32)
+            similarities[start:end] = (block @ query) * self.scales[start:end]
+        k = min(k, len(similarities))
+        if k == 0:
+            return np.array([], dtype=np.int64), similarities
+        top = np.argpartition(-similarities, k - 1)[:k]
+        return top[np.argsort(-similarities[top])], similarities
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding: List[float], k: int = 4, **kwargs):
+        top, similarities = self._top(embedding, k)
+        return [(self.documents[i], 1.0 - float(similarities[i])) for i in top]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        top, _ = self._top(embedding, k)
+        return [self.documents[i] for i in top]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k)
+
+    def max_marginal_relevance_search_by_vector(
+        self, embedding: List[float], k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, **kwargs
+    ) -> List[Document]:
+        top, _ = self._top(embedding, fetch_k)
+        if len(top) == 0:
+            return []
+        selected = maximal_marginal_relevance(
+            _normalize(embedding), self._rows(top), lambda_mult=lambda_mult, k=k
+        )
+        return [self.documents[top[i]] for i in selected]
@@ -0,0 +1,144 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+import graph
+from graph import compress_context
+from retrieval import BM25Index, MmapVectorStore, _quantize, tokenize_zh
+
+CORPUS = [
+    "第一千一百六十五条 饲养的动物造成他人损害的，动物饲养人或者管理人应当承担侵权责任。",
+    "第五百七十七条 当事人一方不履行合同义务或者履行合同义务不符合约定的，应当承担违约责任。",
+    "第一千一百二十七条 遗产按照下列顺序继承：第一顺序：配偶、子女、父母。",
+    "出卖人交付的标的物不符合质量要求的，买受人可以请求退货、更换或者修理。",
+    "建筑物中抛掷物品或者从建筑物上坠落的物品造成他人损害的，由侵权人依法承担侵权责任。",
+]
+
+
+def brute_force_bm25(documents, query, k1=1.5, b=0.75):
+    """Textbook Okapi BM25 with Lucene idf, one document at a time."""
+    tokenized = [tokenize_zh(d) for d in documents]
+    avgdl = max(sum(len(t) for t in tokenized) / len(tokenized), 1.0)
+    scores = []
+    for tokens in tokenized:
+        tf = Counter(tokens)
+        score = 0.0
+        for token in set(tokenize_zh(query)):
+            if token not in tf:
+                continue
+            df = sum(1 for t in tokenized if token in t)
+            idf = math.log1p((len(tokenized) - df + 0.5) / (df + 0.5))
+            score += idf * tf[token] * (k1 + 1) / (tf[token] + k1 * (1 - b + b * len(tokens) / avgdl))
+        scores.append(score)
+    return scores
+
+
+@pytest.fixture
+def bm25():
+    return BM25Index.from_documents([Document(page_content=text) for text in CORPUS])
+
+
+@pytest.mark.parametrize("query", ["狗咬人谁承担侵权责任", "违约责任", "第一千一百六十五条", "遗产继承顺序"])
+def test_bm25_scores_match_brute_force(bm25, query):
+    np.testing.assert_allclose(bm25.scores(query), brute_force_bm25(CORPUS, query), rtol=1e-9)
+
+
+def test_bm25_search_orders_by_score(bm25):
+    expected = sorted(range(len(CORPUS)), key=lambda i: -brute_force_bm25(CORPUS, "侵权责任")[i])
+    hits = bm25.search("侵权责任", k=2)
+    assert [d.page_content for d in hits] == [CORPUS[i] for i in expected[:2]]
+
+
+def test_bm25_query_without_hits(bm25):
+    assert not bm25.scores("天气预报").any()
+    assert bm25.search("天气预报", k=3) == []
+
+
+def test_bm25_save_load_round_trip(bm25, tmp_path):
+    bm25.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path), bm25.documents)
+    np.testing.assert_allclose(loaded.scores("违约责任"), bm25.scores("违约责任"))
+
+
+DIM = 1536  # text-embedding-v1
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(600, DIM)).astype(np.float32)
+
+
+def float32_similarities(vectors, query):
+    matrix = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return matrix @ (query / np.linalg.norm(query))
+
+
+def test_int8_top_k_matches_float32_cosine(vectors):
+    documents = [Document(id=str(i), page_content=f"doc {i}") for i in range(len(vectors))]
+    store = MmapVectorStore(None, documents, *_quantize(vectors))
+    queries = np.random.default_rng(1).normal(size=(20, DIM)).astype(np.float32)
+    for query in queries:
+        similarities = float32_similarities(vectors, query)
+        expected = np.argsort(-similarities)[:5]
+        hits = store.similarity_search_by_vector_with_relevance_scores(query.tolist(), k=5)
+        ids = [int(d.id) for d, _ in hits]
+
+        assert ids[0] == expected[0]
+        # Near-ties may swap places, but each rank must be as close as the true neighbour at that rank
+        np.testing.assert_allclose(similarities[ids], similarities[expected], atol=1e-3)
+        np.testing.assert_allclose([distance for _, distance in hits], 1.0 - similarities[ids], atol=1e-3)
+
+
+def test_mmap_round_trip(vectors, tmp_path):
+    documents = [Document(id=str(i), page_content=f"doc {i}") for i in range(len(vectors))]
+    MmapVectorStore.write(str(tmp_path), vectors.tolist())
+    loaded = MmapVectorStore.load(str(tmp_path), None, documents)
+    in_memory = MmapVectorStore(None, documents, *_quantize(vectors))
+
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.matrix.dtype == np.int8
+    query = vectors[42].tolist()
+    assert loaded.similarity_search_by_vector(query, k=5) == in_memory.similarity_search_by_vector(query, k=5)
+    assert loaded.similarity_search_by_vector(query, k=1)[0].id == "42"
+
+
+def sentences_of(context):
+    return [s for part in context.split("\n---\n") for s in part.split("。") if s]
+
+
+@pytest.mark.parametrize("max_tokens", [40, 80, 200])
+def test_compress_context_stays_within_budget(max_tokens):
+    documents = [Document(page_content=text) for text in CORPUS]
+    context = compress_context("动物造成损害谁承担侵权责任", documents, max_tokens)
+    assert 0 < len(context.replace("\n---\n", "")) <= max_tokens
+
+
+def test_compress_context_keeps_sentence_order():
+    document = Document(page_content="甲句讲侵权责任。乙句无关内容。丙句也讲侵权责任和损害。丁句讲损害赔偿。")
+    context = compress_context("侵权责任损害", [document], max_tokens=30)
+    kept = sentences_of(context)
+    assert len(kept) >= 2
+    original = sentences_of(document.page_content)
+    assert [original.index(s) for s in kept] == sorted(original.index(s) for s in kept)
+
+
+@pytest.mark.parametrize(("question", "max_tokens"), [("侵权责任", 5), ("完全无关的问题", 50)])
+def test_compress_context_never_empty(question, max_tokens):
+    documents = [Document(page_content=text) for text in CORPUS]
+    context = compress_context(question, documents, max_tokens)
+    assert context
+    assert len(context.replace("\n---\n", "")) <= max_tokens
+
+
+def test_hybrid_search_keeps_keyword_only_hits(bm25, monkeypatch):
+    monkeypatch.setattr(graph, "get_bm25_index", lambda: bm25)
+    dense_docs = [Document(page_content=text) for text in CORPUS[1:]]
+    fused = graph.hybrid_search("第一千一百六十五条 饲养动物", dense_docs, k=4)
+
+    contents = [d.page_content for d in fused]
+    assert CORPUS[0] in contents  # found by BM25 only
+    assert set(CORPUS[1:]) <= set(contents)
+    assert len(fused) <= 8
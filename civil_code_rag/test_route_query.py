@@ -0,0 +1,24 @@
+import pytest
+
+from graph import route_query
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "网购的商品有质量问题可以退货吗",
+        "我被邻居家的狗咬了怎么办",
+        "楼上漏水把我家天花板泡坏了谁负责",
+        "父母去世后存款怎么分",
+        "离婚后孩子的抚养权归谁？",
+        "你好，我想问一下租房押金不退怎么办",
+        "因为天气原因没能按时交货，算违约吗",
+    ],
+)
+def test_civil_code_questions_are_retrieved(question):
+    assert route_query({"question": question}) == "in_scope"
+
+
+@pytest.mark.parametrize("question", ["你好", "您好！", "Hello", "谢谢", "你是谁", "今天天气怎么样", "讲个笑话"])
+def test_small_talk_is_refused(question):
+    assert route_query({"question": question}) == "out_of_scope"
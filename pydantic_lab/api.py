@@ -3,21 +3,24 @@ from __future__ import annotations
 
 from typing import Dict
 
-from fastapi import FastAPI, HTTPException
+import orjson
+from fastapi import FastAPI, HTTPException, Response
 
 from .models import User
 from .settings import get_settings
 
 app = FastAPI(title="Pydantic Lab")
 settings = get_settings()
+# 配置在进程生命周期内不变，启动时序列化一次，避免每个请求重复 model_dump
+_SETTINGS_BODY = orjson.dumps(settings.model_dump())
 _database: Dict[int, User] = {}
 
 
 @app.get("/settings")
-def read_settings() -> dict:
+def read_settings() -> Response:
     """返回当前加载的配置，便于调试和学习。"""
 
-    return settings.model_dump()
+    return Response(content=_SETTINGS_BODY, media_type="application/json")
 
 
 @app.post("/users", response_model=User)
@@ -2,37 +2,51 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import sys
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import IO, Iterable, Optional, Union
+
+import orjson
+from pydantic import TypeAdapter
 
 from .models import User
 from .settings import get_settings
 
 
-def read_json_source(path: Optional[Path], inline_json: Optional[str]) -> str:
-    """读取 JSON 文本，可来自文件、内联字符串或标准输入。
+# 模块级复用同一个校验器，避免每次调用都走 BaseModel 的类方法分派
+_USER_ADAPTER = TypeAdapter(User)
+
+
+def read_json_source(
+    path: Union[str, os.PathLike, IO[bytes], None], inline_json: Optional[str]
+) -> bytes:
+    """读取 JSON 原始字节，可来自文件、内联字符串或标准输入。
 
     - 如果同时传入 `-f` 与 `-j`，视为用户误操作，直接提示冲突。
+    - `path` 可以是文件路径，也可以是已打开的二进制文件对象（如 `io.BytesIO`）。
     - 当给定文件路径时，提前检查文件是否存在，给出中文错误信息。
+    - 返回 bytes：pydantic-core 可直接解析字节，省去一次 str 编解码。
     """
 
     if path and inline_json:
         raise ValueError("请仅选择文件(-f)或内联 JSON(-j) 之一，避免参数冲突")
     if inline_json:
-        return inline_json
+        return inline_json.encode("utf-8")
+    if path and hasattr(path, "read"):
+        return path.read()
     if path:
+        path = Path(path)
         if not path.exists():
             raise FileNotFoundError(f"未找到指定的 JSON 文件：{path}")
-        return path.read_text(encoding="utf-8")
-    return sys.stdin.read()
+        return path.read_bytes()
+    return sys.stdin.buffer.read()
 
 
-def validate_user(json_text: str) -> User:
-    """解析并校验 JSON，返回 `User` 模型实例。"""
+def validate_user(json_data: Union[str, bytes]) -> User:
+    """解析并校验 JSON（str 或 bytes），返回 `User` 模型实例。"""
 
-    return User.model_validate_json(json_text)
+    return _USER_ADAPTER.validate_json(json_data)
 
 
 def format_user(user: User) -> str:
@@ -43,7 +57,8 @@ def format_user(user: User) -> str:
         "settings": settings.model_dump(),
         "user": user.model_dump(mode="json"),
     }
-    return json.dumps(payload, indent=2, ensure_ascii=False)
+    # orjson 直接输出 UTF-8（中文不转义），比标准库 json 更快
+    return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
 
 
 def main(argv: Optional[Iterable[str]] = None) -> int:
@@ -55,8 +70,8 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     args = parser.parse_args(args=argv)
 
     try:
-        json_text = read_json_source(args.file, args.json)
-        user = validate_user(json_text)
+        json_data = read_json_source(args.file, args.json)
+        user = validate_user(json_data)
         print(format_user(user))
     except Exception as exc:  # noqa: BLE001
         parser.exit(status=1, message=f"校验失败：{exc}\n")
@@ -10,7 +10,9 @@
 """
 
 import operator
-from typing import Annotated, List, Optional
+import re
+from collections import Counter
+from typing import Annotated, Dict, List, Optional
 
 from langgraph.graph import END, StateGraph
 from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
@@ -58,38 +60,46 @@ CORPUS = [
 ]
 
 
+def tokenize(text: str, for_index: bool = False) -> List[str]:
+    """小写后切词，语料和查询共用同一套规则。
+
+    英文、数字按整词保留；中文没有空格分词，连续汉字切成相邻二字（单字保持原样），
+    这样 "检索" 也能命中 "向量检索与关键词"。建索引时额外收录单字，单字查询同样可命中。
+    """
+    tokens: List[str] = []
+    for run in re.findall(r"[a-z0-9_]+|[\u4e00-\u9fff]+", text.lower()):
+        if run.isascii() or len(run) == 1:
+            tokens.append(run)
+            continue
+        tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        if for_index:
+            tokens.extend(run)
+    return tokens
+
+
+# 导入时对语料分词一次，并建立倒排索引：token -> {doc_id: 词频}
+TOKENS = [tokenize(doc.title + " " + doc.content, for_index=True) for doc in CORPUS]
+INV_INDEX: Dict[str, Counter] = {}
+for doc_id, tokens in enumerate(TOKENS):
+    for token in tokens:
+        INV_INDEX.setdefault(token, Counter())[doc_id] += 1
+
+
 def retrieve(state: RagState) -> dict:
-    """基于关键词计数的简易检索，返回 top_k 文档。"""
-    query_tokens: List[str] = []
-    for token in state.user_query.lower().split():
-        clean = token.strip()
-        if clean:
-            query_tokens.append(clean)
+    """基于倒排索引的词频打分检索，返回 top_k 文档。"""
+    query_tokens = tokenize(state.user_query)
 
     if not query_tokens:
         # 如果查询为空，返回空检索
         return {"retrieved": [], "steps": ["retrieve"]}
 
-    def score(doc: Doc) -> int:
-        text = (doc.title + " " + doc.content).lower()
-        total = 0
-        for tok in query_tokens:
-            total += text.count(tok)
-        return total
-
-    # 计算每个文档的得分
-    scored_docs: List[tuple[Doc, int]] = []
-    for doc in CORPUS:
-        scored_docs.append((doc, score(doc)))
-
-    # 按得分降序排序
-    scored_sorted = sorted(scored_docs, key=lambda item: item[1], reverse=True)
-
-    # 取前 top_k 个文档
-    top_docs: List[Doc] = []
-    for doc, _score in scored_sorted[: state.top_k]:
-        top_docs.append(doc)
+    # 所有文档先记 0 分，保证命中不足 top_k 时仍按语料顺序补齐
+    scores = Counter(dict.fromkeys(range(len(CORPUS)), 0))
+    for tok in query_tokens:
+        scores.update(INV_INDEX.get(tok, {}))
 
+    # most_common 按得分降序，同分保持语料顺序
+    top_docs = [CORPUS[doc_id] for doc_id, _score in scores.most_common(state.top_k)]
     return {"retrieved": top_docs, "steps": ["retrieve"]}
 
 
@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, RootModel, field_validator
+from pydantic import AfterValidator, BaseModel, ConfigDict, EmailStr, Field, HttpUrl, RootModel, field_validator
 
 
 class Address(BaseModel):
@@ -74,26 +74,21 @@ class User(BaseModel):
     @field_validator("tags")
     @classmethod
     def unique_tags(cls, value: List[str]) -> List[str]:
-        """保持标签列表的顺序并去重，便于后续展示。"""
+        """保持标签列表的顺序并去重，便于后续展示（dict 保留插入顺序，O(n)）。"""
 
-        seen: List[str] = []
-        for tag in value:
-            if tag not in seen:
-                seen.append(tag)
-        return seen
+        return list(dict.fromkeys(value))
 
 
-class TagList(RootModel[List[str]]):
-    """基于 RootModel 的纯列表验证示例。"""
+def _lower_tags(values: List[str]) -> List[str]:
+    """将标签统一为小写并去重（保持首次出现的顺序），便于比较与搜索。"""
 
-    root: List[str]
+    return list(dict.fromkeys(v.lower() for v in values))
 
-    @field_validator("root")
-    @classmethod
-    def require_lowercase(cls, values: List[str]) -> List[str]:
-        """将标签统一为小写，便于比较与搜索。"""
 
-        return [v.lower() for v in values]
+class TagList(RootModel[List[str]]):
+    """基于 RootModel 的纯列表验证示例。"""
+
+    root: Annotated[List[str], AfterValidator(_lower_tags)]
 
 
 __all__ = ["Address", "Profile", "TagList", "User"]
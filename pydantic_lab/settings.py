@@ -1,21 +1,50 @@
 """Pydantic 学习实验的配置示例，展示如何读取环境变量。"""
 from __future__ import annotations
 
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, Any
+
+from pydantic import BeforeValidator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+# 导入时探测一次 .env；不存在时不挂载 dotenv 文件，省去每次实例化的 stat/open
+_ENV_FILE = Path(".env") if Path(".env").is_file() else None
+
+_TRUTHY = frozenset({"1", "true", "t", "yes", "y", "on"})
+_FALSY = frozenset({"0", "false", "f", "no", "n", "off"})
+
+
+def _fast_bool(value: Any) -> Any:
+    """环境变量里的开关值：查一次集合即可；无法识别的字符串直接报错，不会悄悄变成 False。"""
+
+    if not isinstance(value, str):
+        return value
+    lowered = value.strip().lower()
+    if lowered in _TRUTHY:
+        return True
+    if lowered in _FALSY:
+        return False
+    raise ValueError(f"无法识别的布尔值：{value!r}")
+
+
 class AppSettings(BaseSettings):
     """从环境变量加载的应用配置。"""
 
     db_url: str
-    debug: bool = False
+    debug: Annotated[bool, BeforeValidator(_fast_bool)] = False
     log_level: str = "INFO"
 
-    model_config = SettingsConfigDict(env_file=".env", env_prefix="APP_", extra="ignore")
+    model_config = SettingsConfigDict(env_file=_ENV_FILE, env_prefix="APP_", extra="ignore", frozen=True)
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> AppSettings:
-    """CLI 与 FastAPI 共享的配置加载辅助函数。"""
+    """CLI 与 FastAPI 共享的配置加载辅助函数。
+
+    结果只构建一次并复用；修改环境变量后需调用 `get_settings.cache_clear()`。
+    """
 
     return AppSettings()
 
@@ -0,0 +1,13 @@
+"""测试公共配置：提供所有用例共享的 fixture。"""
+
+import pytest
+
+from pydantic_lab.settings import get_settings
+
+
+@pytest.fixture(autouse=True)
+def _clear_settings_cache():
+    """get_settings 带缓存，每个用例前后清空，避免环境变量在用例间串用。"""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
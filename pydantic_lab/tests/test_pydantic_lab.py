@@ -2,19 +2,43 @@ from __future__ import annotations
 
 """Pydantic 学习实验的测试用例，覆盖校验、格式化与配置读取。"""
 
-import json
+import io
+import sys
 from pathlib import Path
 
 import pytest
+from pydantic import ValidationError
 
 from pydantic_lab.cli import format_user, read_json_source, validate_user
+from pydantic_lab.langgraph_rag_demo import RagState, retrieve
 from pydantic_lab.models import TagList, User
-from pydantic_lab.settings import AppSettings
+from pydantic_lab.settings import AppSettings, get_settings
+
+# 预先序列化好的用例数据（bytes），避免每个用例重复 dumps，并走 pydantic-core 的字节解析路径
+_ALICE_PAYLOAD = b'{"id": 1, "name": " Alice ", "email": "alice@example.com"}'
+_BOB_PAYLOAD = b'{"id": 2, "name": "Bob", "email": "bob@example.com"}'
+_CARA_PAYLOAD = b'{"id": 3, "name": "Cara", "email": "c@example.com"}'
+
+
+@pytest.fixture
+def app_env(monkeypatch) -> str:
+    """一次性设置读取配置所需的全部环境变量，返回其中的 db_url。"""
+    db_url = "postgresql://localhost:5432/app"
+    monkeypatch.setenv("APP_DB_URL", db_url)
+    monkeypatch.setenv("APP_DEBUG", "true")
+    return db_url
+
+
+@pytest.fixture(scope="session")
+def user_json(tmp_path_factory) -> Path:
+    """整个测试会话共用一份 Bob 的 JSON 文件，只创建一次临时目录。"""
+    path = tmp_path_factory.mktemp("user") / "user.json"
+    path.write_bytes(_BOB_PAYLOAD)
+    return path
 
 
 def test_user_validation_strips_whitespace():
-    payload = json.dumps({"id": 1, "name": " Alice ", "email": "alice@example.com"})
-    user = validate_user(payload)
+    user = validate_user(_ALICE_PAYLOAD)
     assert user.name == "Alice"
 
 
@@ -23,37 +47,92 @@ def test_taglist_normalizes_to_lowercase():
     assert tags.root == ["pycon", "python"]
 
 
-def test_cli_format_includes_settings(monkeypatch, tmp_path: Path):
-    monkeypatch.setenv("APP_DB_URL", "sqlite:///demo.db")
-    monkeypatch.setenv("APP_DEBUG", "true")
-    user_json = tmp_path / "user.json"
-    user_json.write_text(json.dumps({"id": 2, "name": "Bob", "email": "bob@example.com"}), encoding="utf-8")
+def test_taglist_lowercases_tuple_input():
+    tags = TagList.model_validate(("PyCon", "PYTHON"))
+    assert tags.root == ["pycon", "python"]
+
+
+def test_taglist_dedupes_after_lowercasing():
+    tags = TagList.model_validate(["Python", "PyCon", "PYTHON"])
+    assert tags.root == ["python", "pycon"]
+
 
-    raw_json = read_json_source(path=user_json, inline_json=None)
+def test_user_tags_unique_in_order():
+    user = User(id=1, name="Alice", email="alice@example.com", tags=["b", "a", "b"])
+    assert user.tags == ["b", "a"]
+
+
+def test_cli_format_includes_settings(app_env: str):
+    raw_json = read_json_source(path=io.BytesIO(_BOB_PAYLOAD), inline_json=None)
     user = validate_user(raw_json)
-    formatted = json.loads(format_user(user))
+    formatted = format_user(user)
+
+    # format_user 输出固定格式的缩进 JSON，直接按子串断言即可
+    assert f'"db_url": "{app_env}"' in formatted
+    assert '"debug": true' in formatted
+    assert '"email": "bob@example.com"' in formatted
 
-    assert formatted["settings"]["db_url"] == "sqlite:///demo.db"
-    assert formatted["settings"]["debug"] is True
-    assert formatted["user"]["email"] == "bob@example.com"
+
+@pytest.mark.parametrize("db_url", ["postgresql://localhost:5432/app", "sqlite:///demo.db"])
+def test_settings_read_from_env(app_env: str, monkeypatch, db_url: str):
+    monkeypatch.setenv("APP_DB_URL", db_url)
+    settings = AppSettings()
+    assert settings.db_url == db_url
+    assert settings.debug is True
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [("true", True), ("Y", True), ("t", True), ("on", True), ("false", False), ("n", False), ("0", False), ("OFF", False)],
+)
+def test_settings_debug_flag_values(app_env: str, monkeypatch, raw: str, expected: bool):
+    monkeypatch.setenv("APP_DEBUG", raw)
+    assert AppSettings().debug is expected
 
 
-def test_settings_read_from_env(monkeypatch):
-    monkeypatch.setenv("APP_DB_URL", "postgresql://localhost:5432/app")
+@pytest.mark.parametrize("raw", ["ture", "maybe", ""])
+def test_settings_debug_flag_rejects_unknown_values(app_env: str, monkeypatch, raw: str):
+    monkeypatch.setenv("APP_DEBUG", raw)
+    with pytest.raises(ValidationError):
+        AppSettings()
+
+
+def test_settings_env_names_are_case_insensitive(monkeypatch):
+    monkeypatch.setenv("app_db_url", "sqlite:///lower.db")
+    monkeypatch.setenv("app_log_level", "DEBUG")
     settings = AppSettings()
-    assert settings.db_url.startswith("postgresql://")
+    assert settings.db_url == "sqlite:///lower.db"
+    assert settings.log_level == "DEBUG"
+
+
+def test_settings_are_frozen(app_env: str):
+    settings = get_settings()
+    with pytest.raises(ValidationError):
+        settings.debug = True
+
+
+def test_read_json_source_file(user_json: Path):
+    assert read_json_source(path=user_json, inline_json=None) == _BOB_PAYLOAD
+    assert read_json_source(path=str(user_json), inline_json=None) == _BOB_PAYLOAD
 
 
 def test_read_json_source_stdin(monkeypatch, capsys):
-    monkeypatch.setattr("sys.stdin.read", lambda: "{\"id\":3,\"name\":\"Cara\",\"email\":\"c@example.com\"}")
-    text = read_json_source(path=None, inline_json=None)
-    assert "Cara" in text
-    assert validate_user(text).id == 3
+    stdin = io.TextIOWrapper(io.BytesIO(_CARA_PAYLOAD))
+    monkeypatch.setattr(sys, "stdin", stdin)
+    data = read_json_source(path=None, inline_json=None)
+    assert b"Cara" in data
+    assert validate_user(data).id == 3
+
+
+def test_read_json_source_inline_returns_bytes():
+    data = read_json_source(path=None, inline_json='{"id":4,"name":"Dan","email":"d@example.com"}')
+    assert isinstance(data, bytes)
+    assert validate_user(data).name == "Dan"
 
 
 def test_read_json_source_conflict_args(tmp_path: Path):
     fake = tmp_path / "payload.json"
-    fake.write_text("{}", encoding="utf-8")
+    fake.write_bytes(b"{}")
     with pytest.raises(ValueError):
         read_json_source(path=fake, inline_json="{}")
 
@@ -62,3 +141,12 @@ def test_read_json_source_missing_file(tmp_path: Path):
     missing = tmp_path / "missing.json"
     with pytest.raises(FileNotFoundError):
         read_json_source(path=missing, inline_json=None)
+
+
+@pytest.mark.parametrize(
+    ("query", "expected_title"),
+    [("向量检索", "向量检索与关键词"), ("检索", "向量检索与关键词"), ("状态图", "LangGraph 简介")],
+)
+def test_demo_retrieve_matches_inside_chinese_text(query, expected_title):
+    titles = [doc.title for doc in retrieve(RagState(user_query=query))["retrieved"]]
+    assert expected_title in titles